@@ -1,21 +1,93 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import OperationalError, connection, transaction
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils.functional import cached_property
 from .models import Challenge, ChallengeParticipant, ChallengeReward
 
 
+QUERY_CANCELED = "57014"
+
+
+class TimeLimitedPaginator(Paginator):
+    # COUNT(*) over every participant row gets slow as the table grows; give up
+    # after a short timeout and let the changelist show an approximate page count
+    @cached_property
+    def count(self):
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute("SHOW statement_timeout")
+                (previous,) = cursor.fetchone()
+                cursor.execute("SET LOCAL statement_timeout TO 200")
+                count = super().count
+                # Under an outer transaction (ATOMIC_REQUESTS) this block is only a
+                # savepoint, and SET LOCAL would otherwise last for the rest of the request
+                cursor.execute("SELECT set_config('statement_timeout', %s, true)", [previous])
+                return count
+        except OperationalError as e:
+            # psycopg exposes the SQLSTATE as sqlstate, psycopg2 as pgcode
+            code = getattr(e.__cause__, "sqlstate", None) or getattr(e.__cause__, "pgcode", None)
+            if code != QUERY_CANCELED:
+                raise
+        # The timed-out savepoint was rolled back along with its SET LOCAL
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [self.object_list.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        return max(row[0], 0) if row else 0
+
+
 class ChallengeRewardInline(admin.TabularInline):
     model = ChallengeReward
     extra = 1
+    ordering = ["rank"]
     raw_id_fields = ["ball"]  # autocomplete_fields needs Ball admin search_fields
 
 
 @admin.register(Challenge)
 class ChallengeAdmin(admin.ModelAdmin):
-    list_display = ("name", "start_time", "end_time", "goal_type", "active")
+    list_display = ("name", "start_time", "end_time", "goal_type", "active", "rewards_distributed_at", "total_score")
     list_filter = ("active", "goal_type")
+    search_fields = ("name",)
     inlines = [ChallengeRewardInline]
 
+    def get_queryset(self, request):
+        # Correlated subquery rather than a join + GROUP BY, so only the challenges
+        # actually fetched (changelist page, change form, autocomplete) are summed
+        scores = (
+            ChallengeParticipant.objects.filter(challenge=OuterRef("pk"))
+            .values("challenge")
+            .annotate(total=Sum("score"))
+            .values("total")
+        )
+        return super().get_queryset(request).defer("description").annotate(
+            total_score=Coalesce(Subquery(scores), Value(0))
+        )
+
+    @admin.display(description="Total score", ordering="total_score")
+    def total_score(self, obj):
+        return obj.total_score
+
+    def get_deleted_objects(self, objs, request):
+        # Participants and rewards go through ON DELETE CASCADE in the database, which
+        # the collector behind the confirmation page does not see; add them to the summary
+        deleted_objects, model_count, perms_needed, protected = super().get_deleted_objects(objs, request)
+        pks = [obj.pk for obj in objs]
+        for model in (ChallengeParticipant, ChallengeReward):
+            count = model.objects.filter(challenge__in=pks).count()
+            if count:
+                model_count[model._meta.verbose_name_plural] = count
+        return deleted_objects, model_count, perms_needed, protected
+
 
 @admin.register(ChallengeParticipant)
 class ChallengeParticipantAdmin(admin.ModelAdmin):
     list_display = ("challenge", "player", "score")
+    list_select_related = ("challenge", "player")
+    paginator = TimeLimitedPaginator
+    show_full_result_count = False
+    autocomplete_fields = ("challenge",)
     raw_id_fields = ("player",)  # same reason — Player admin search_fields not guaranteed
\ No newline at end of file
@@ -6,5 +6,5 @@ if TYPE_CHECKING:
     from ballsdex.core.bot import BallsDexBot
 
 async def setup(bot: "BallsDexBot"):
-    patch.apply_patches()
+    patch.apply_patches(bot)
     await bot.add_cog(ChallengesCog(bot))
@@ -1,47 +1,195 @@
+from collections import OrderedDict, defaultdict
 from typing import TYPE_CHECKING
+import asyncio
+import logging
+import time
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils import timezone
 import random
 
-from bd_models.models import Player, Ball, BallInstance
+from bd_models.models import Player, BallInstance
 from ..models import Challenge, ChallengeParticipant, ChallengeReward
 
 if TYPE_CHECKING:
     from ballsdex.core.bot import BallsDexBot
 
+log = logging.getLogger("ballsdex.packages.community_challenges")
+
+# The admin panel usually runs in another process, so the signal only covers
+# edits made from the bot itself; the TTL bounds staleness for the rest.
+ACTIVE_CACHE_TTL = 60
+LEADERBOARD_CACHE_TTL = 15
+SCORE_FLUSH_INTERVAL = 1
+PLAYER_ID_CACHE_SIZE = 10_000
+
+_active_by_type: dict[str, list[Challenge]] | None = None
+_active_loaded_at = 0.0
+
+
+@receiver([post_save, post_delete], sender=Challenge)
+def _invalidate_active_challenges(**kwargs):
+    global _active_by_type
+    _active_by_type = None
+
+
+async def _active_challenges(goal_type: str) -> list[Challenge]:
+    global _active_by_type, _active_loaded_at
+    if _active_by_type is None or time.monotonic() - _active_loaded_at > ACTIVE_CACHE_TTL:
+        by_type = defaultdict(list)
+        challenges = Challenge.objects.filter(active=True, end_time__gte=timezone.now())
+        async for challenge in challenges.only("goal_type", "start_time", "end_time"):
+            by_type[challenge.goal_type].append(challenge)
+        _active_by_type, _active_loaded_at = by_type, time.monotonic()
+
+    now = timezone.now()
+    return [c for c in _active_by_type.get(goal_type, ()) if c.start_time <= now <= c.end_time]
+
+
+class DistributionInProgress(Exception):
+    pass
+
+
+class RewardsAlreadyDistributed(Exception):
+    pass
+
+
 class ChallengesCog(commands.GroupCog, group_name="challenges"):
     def __init__(self, bot: "BallsDexBot"):
         self.bot = bot
+        self._leaderboard_cache: dict[int, tuple[float, list[tuple[int, int]]]] = {}
+        # (challenge_id, player_id) -> points not yet written to the database
+        self._pending_scores: defaultdict[tuple[int, int], int] = defaultdict(int)
+        # Held for a whole flush, so callers that need scores persisted also wait
+        # for a flush the loop already started
+        self._flush_lock = asyncio.Lock()
+        # discord_id -> Player pk, a player's pk never changes once created
+        self._player_ids: OrderedDict[int, int] = OrderedDict()
+
+    async def cog_load(self):
+        self.flush_scores.start()
+
+    async def cog_unload(self):
+        self.flush_scores.stop()
+
+    @tasks.loop(seconds=SCORE_FLUSH_INTERVAL)
+    async def flush_scores(self):
+        await self._flush_scores()
+
+    @flush_scores.after_loop
+    async def _flush_remaining_scores(self):
+        await self._flush_scores()
 
     @commands.Cog.listener()
     async def on_challenge_score_add(self, discord_id: int, goal_type: str, amount: int = 1):
-        now = timezone.now()
-        
-        active_challenges = Challenge.objects.filter(
-            active=True,
-            start_time__lte=now,
-            end_time__gte=now,
-            goal_type=goal_type
-        )
-        
-        if not await active_challenges.aexists():
+        active_challenges = await _active_challenges(goal_type)
+        if not active_challenges:
             return
             
-        try:
-            player = await Player.objects.aget(discord_id=discord_id)
-        except Player.DoesNotExist:
+        player_id = await self._player_id(discord_id)
+        if player_id is None:
             return
 
-        async for challenge in active_challenges:
-            participant, _ = await ChallengeParticipant.objects.aget_or_create(
-                challenge=challenge,
-                player=player,
-                defaults={"score": 0}
+        self._queue_score(player_id, active_challenges, amount)
+
+    @commands.Cog.listener()
+    async def on_challenge_player_score_add(self, player_id: int, goal_type: str, amount: int = 1):
+        active_challenges = await _active_challenges(goal_type)
+        if active_challenges:
+            self._queue_score(player_id, active_challenges, amount)
+
+    async def _player_id(self, discord_id: int) -> int | None:
+        player_id = self._player_ids.get(discord_id)
+        if player_id is not None:
+            self._player_ids.move_to_end(discord_id)
+            return player_id
+
+        player_id = await Player.objects.filter(discord_id=discord_id).values_list("pk", flat=True).afirst()
+        if player_id is not None:
+            self._player_ids[discord_id] = player_id
+            if len(self._player_ids) > PLAYER_ID_CACHE_SIZE:
+                self._player_ids.popitem(last=False)
+        return player_id
+
+    def _queue_score(self, player_id: int, active_challenges: list[Challenge], amount: int):
+        for challenge in active_challenges:
+            self._pending_scores[(challenge.pk, player_id)] += amount
+
+    async def _flush_scores(self):
+        async with self._flush_lock:
+            if not self._pending_scores:
+                return
+            pending, self._pending_scores = self._pending_scores, defaultdict(int)
+
+            by_challenge: defaultdict[int, dict[int, int]] = defaultdict(dict)
+            for (challenge_id, player_id), amount in pending.items():
+                by_challenge[challenge_id][player_id] = amount
+
+            for challenge_id, scores in by_challenge.items():
+                try:
+                    try:
+                        await self._write_scores(challenge_id, scores)
+                    except IntegrityError:
+                        # The challenge or some players were deleted in the meantime,
+                        # only drop the points that no longer have a row to go to
+                        existing = await self._existing_players(challenge_id, scores)
+                        if existing is None:
+                            log.warning(f"Dropping {len(scores)} pending scores for deleted challenge {challenge_id}")
+                            continue
+                        # Forget deleted players so a recreated account is looked up again
+                        stale = scores.keys() - existing
+                        self._player_ids = OrderedDict(
+                            (discord_id, pk) for discord_id, pk in self._player_ids.items() if pk not in stale
+                        )
+                        log.warning(
+                            f"Dropping pending scores of {len(stale)} deleted players for challenge {challenge_id}"
+                        )
+                        scores = {pk: amount for pk, amount in scores.items() if pk in existing}
+                        if scores:
+                            await self._write_scores(challenge_id, scores)
+                except Exception:
+                    log.exception(f"Failed to save pending scores for challenge {challenge_id}, retrying later")
+                    for player_id, amount in scores.items():
+                        self._pending_scores[(challenge_id, player_id)] += amount
+
+    async def _write_scores(self, challenge_id: int, scores: dict[int, int]):
+        await ChallengeParticipant.objects.abulk_create(
+            [ChallengeParticipant(challenge_id=challenge_id, player_id=pk, score=0) for pk in scores],
+            ignore_conflicts=True
+        )
+        await ChallengeParticipant.objects.filter(
+            challenge_id=challenge_id, player_id__in=scores
+        ).aupdate(
+            score=F("score") + Case(
+                *(When(player_id=pk, then=Value(amount)) for pk, amount in scores.items()),
+                default=Value(0)
             )
-            participant.score += amount
-            await participant.asave()
+        )
+
+    async def _existing_players(self, challenge_id: int, scores: dict[int, int]) -> set[int] | None:
+        if not await Challenge.objects.filter(pk=challenge_id).aexists():
+            return None
+        return {pk async for pk in Player.objects.filter(pk__in=scores).values_list("pk", flat=True)}
+
+    async def _top_participants(self, challenge: Challenge) -> list[tuple[int, int]]:
+        cached = self._leaderboard_cache.get(challenge.pk)
+        if cached and time.monotonic() - cached[0] < LEADERBOARD_CACHE_TTL:
+            return cached[1]
+
+        participants = (
+            ChallengeParticipant.objects.filter(challenge=challenge)
+            .order_by('-score')
+            .values_list("player__discord_id", "score")[:10]
+        )
+        top = [row async for row in participants]
+        self._leaderboard_cache[challenge.pk] = (time.monotonic(), top)
+        return top
 
     @app_commands.command(name="leaderboard")
     async def leaderboard(self, interaction: discord.Interaction["BallsDexBot"]):
@@ -51,14 +199,12 @@ class ChallengesCog(commands.GroupCog, group_name="challenges"):
         if not challenge:
             return await interaction.response.send_message("There is no active challenge right now.", ephemeral=True)
             
-        participants = ChallengeParticipant.objects.filter(challenge=challenge).order_by('-score')[:10]
         embed = discord.Embed(title=f"🏆 Challenge: {challenge.name}", description=challenge.description, color=discord.Color.gold())
         
-        text, rank = "", 1
-        async for part in participants:
-            await part.player.arefresh_from_db()
-            text += f"**#{rank}** <@{part.player.discord_id}> - {part.score} pts\n"
-            rank += 1
+        top = await self._top_participants(challenge)
+        text = "\n".join(
+            f"**#{rank}** <@{discord_id}> - {score} pts" for rank, (discord_id, score) in enumerate(top, start=1)
+        )
             
         embed.add_field(name="Top 10 Leaderboard", value=text or "No participants yet. Go score some points!")
         await interaction.response.send_message(embed=embed)
@@ -67,46 +213,96 @@ class ChallengesCog(commands.GroupCog, group_name="challenges"):
     @app_commands.default_permissions(administrator=True)
     async def distribute_rewards(self, interaction: discord.Interaction["BallsDexBot"], challenge_name: str):
         await interaction.response.defer(ephemeral=True)
+        await self._flush_scores()
         
         try:
             challenge = await Challenge.objects.aget(name=challenge_name)
         except Challenge.DoesNotExist:
             return await interaction.followup.send("Challenge not found.")
             
-        if challenge.active:
-            challenge.active = False
-            await challenge.asave()
-            
-        # Get configured rewards and map them by rank
-        rewards_map = {}
-        async for reward in ChallengeReward.objects.filter(challenge=challenge):
-            if reward.rank not in rewards_map:
-                rewards_map[reward.rank] = []
-            rewards_map[reward.rank].append((reward.ball_id, reward.amount))
-            
-        participants = ChallengeParticipant.objects.filter(challenge=challenge, score__gt=0).order_by('-score')
-        distributed_count = 0
-        rank = 1
-        
-        async for part in participants:
-            player = part.player
+        try:
+            distributed_count = await self._distribute(challenge)
+        except Challenge.DoesNotExist:
+            return await interaction.followup.send("Challenge not found.")
+        except DistributionInProgress:
+            return await interaction.followup.send("Rewards for this challenge are already being distributed.")
+        except RewardsAlreadyDistributed:
+            return await interaction.followup.send("Rewards for this challenge have already been distributed.")
+
+        if distributed_count is None:
+            return await interaction.followup.send("✅ Challenge closed. No rewards are configured for it.")
+        await interaction.followup.send(f"✅ Challenge closed. Rewards automatically distributed to {distributed_count} top players.")
+
+    @distribute_rewards.autocomplete("challenge_name")
+    async def _autocomplete_challenge(
+        self, interaction: discord.Interaction["BallsDexBot"], current: str
+    ) -> list[app_commands.Choice[str]]:
+        names = (
+            Challenge.objects.filter(name__icontains=current)
+            .order_by("-end_time")
+            .values_list("name", flat=True)[:25]
+        )
+        return [app_commands.Choice(name=name, value=name) async for name in names]
+
+    @sync_to_async
+    def _distribute(self, challenge: Challenge) -> int | None:
+        with transaction.atomic():
+            # Row lock held until commit, so a second distribution from any process backs
+            # off; NO KEY keeps it from blocking participant inserts referencing the row
+            locked = Challenge.objects.select_for_update(skip_locked=True, no_key=True).filter(pk=challenge.pk)
+            if not locked.values_list("pk", flat=True).first():
+                # SKIP LOCKED returns nothing for a deleted row too
+                if not Challenge.objects.filter(pk=challenge.pk).exists():
+                    raise Challenge.DoesNotExist
+                raise DistributionInProgress
+
+            # Get configured rewards and map them by rank
+            rewards_map = {}
+            rewards = ChallengeReward.objects.filter(challenge=challenge).values_list("rank", "ball_id", "amount")
+            for rank, ball_id, amount in rewards:
+                if rank not in rewards_map:
+                    rewards_map[rank] = []
+                rewards_map[rank].append((ball_id, amount))
+                
+            if not rewards_map:
+                if Challenge.objects.filter(pk=challenge.pk, active=True).update(active=False):
+                    transaction.on_commit(_invalidate_active_challenges)
+                return None
+
+            # The marker, not the active flag (admins toggle that by hand), is what makes
+            # a second run after this one commits a no-op
+            marked = Challenge.objects.filter(pk=challenge.pk, rewards_distributed_at__isnull=True).update(
+                active=False, rewards_distributed_at=timezone.now()
+            )
+            if not marked:
+                raise RewardsAlreadyDistributed
+            transaction.on_commit(_invalidate_active_challenges)
+
+            # Only the ranks that have rewards matter, so stop at the lowest one
+            participants = ChallengeParticipant.objects.filter(
+                challenge=challenge, score__gt=0
+            ).order_by('-score').values_list("player_id", flat=True)[:max(rewards_map)]
+            distributed_count = 0
+            rank = 1
+            now = timezone.now()
+            instances = []
             
-            # Check if there are rewards configured for this rank position
-            if rank in rewards_map:
-                for ball_id, amount in rewards_map[rank]:
-                    try:
-                        ball_obj = await Ball.objects.aget(id=ball_id)
-                        for _ in range(amount):
-                            await BallInstance.objects.acreate(
-                                ball=ball_obj,
-                                player=player,
-                                catch_date=timezone.now(),
+            for player_id in participants:
+                # Check if there are rewards configured for this rank position
+                if rank in rewards_map:
+                    for ball_id, amount in rewards_map[rank]:
+                        instances.extend(
+                            BallInstance(
+                                ball_id=ball_id,
+                                player_id=player_id,
+                                catch_date=now,
                                 attack_bonus=random.randint(-20, 20),
                                 health_bonus=random.randint(-20, 20)
                             )
-                    except Ball.DoesNotExist:
-                        continue
-                distributed_count += 1
-            rank += 1
-            
-        await interaction.followup.send(f"✅ Challenge closed. Rewards automatically distributed to {distributed_count} top players.")
+                            for _ in range(amount)
+                        )
+                    distributed_count += 1
+                rank += 1
+                
+            BallInstance.objects.bulk_create(instances, batch_size=500)
+        return distributed_count
@@ -0,0 +1,77 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    replaces = [
+        ("community_challenge", "0001_initial"),
+        ("community_challenge", "0002_fix_schema"),
+        ("community_challenge", "0003_add_filters"),
+        ("community_challenge", "0004_fix_duplicate_filter_columns"),
+        ("community_challenge", "0005_challenge_challengeparticipant_and_more"),
+        ("community_challenge", "0006_add_challenge_reward"),
+    ]
+
+    initial = True
+
+    dependencies = [
+        ("bd_models", "0014_alter_ball_options_alter_ballinstance_options_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Challenge",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("name", models.CharField(max_length=64)),
+                ("description", models.TextField()),
+                ("start_time", models.DateTimeField()),
+                ("end_time", models.DateTimeField()),
+                ("goal_type", models.CharField(choices=[("balls", "Balls Caught"), ("currency", "Currency Earned")], default="balls", max_length=16)),
+                ("active", models.BooleanField(default=True)),
+                ("reward_config", models.JSONField(default=dict, help_text="Mapping of Rank to rewards in JSON format.")),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ChallengeParticipant",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("score", models.IntegerField(default=0)),
+                ("challenge", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="participants", to="community_challenge.challenge")),
+                ("player", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to="bd_models.player")),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="challengeparticipant",
+            constraint=models.UniqueConstraint(fields=("challenge", "player"), name="unique_challenge_player"),
+        ),
+        migrations.CreateModel(
+            name="ChallengeReward",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("challenge", models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name="rewards",
+                    to="community_challenge.challenge",
+                )),
+                ("rank", models.PositiveIntegerField(
+                    help_text="The rank this reward is given to (e.g., 1 for 1st place)."
+                )),
+                ("ball", models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    to="bd_models.ball",
+                    help_text="The specific ball to reward.",
+                )),
+                ("amount", models.PositiveIntegerField(
+                    default=1,
+                    help_text="How many of this ball to give.",
+                )),
+            ],
+            options={
+                "verbose_name": "Reward",
+                "verbose_name_plural": "Rewards",
+                "ordering": ["rank"],
+            },
+        ),
+    ]
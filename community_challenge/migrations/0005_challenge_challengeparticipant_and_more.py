@@ -6,7 +6,7 @@ from django.db import migrations, models
 
 class Migration(migrations.Migration):
 
-  dependencies = [
+    dependencies = [
         ('bd_models', '0014_alter_ball_options_alter_ballinstance_options_and_more'),  # was 0015
         ('community_challenge', '0004_fix_duplicate_filter_columns'),
     ]
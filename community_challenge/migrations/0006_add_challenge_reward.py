@@ -4,7 +4,7 @@ import django.db.models.deletion
 
 class Migration(migrations.Migration):
 
-     dependencies = [
+    dependencies = [
         ("bd_models", "0014_alter_ball_options_alter_ballinstance_options_and_more"),  # not 0015
         ("community_challenge", "0005_challenge_challengeparticipant_and_more"),
     ]
@@ -0,0 +1,27 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Build the indexes without holding a write lock on populated tables
+    atomic = False
+
+    dependencies = [
+        ("community_challenge", "0006_add_challenge_reward"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="challenge",
+            index=models.Index(
+                condition=models.Q(("active", True)),
+                fields=["end_time"],
+                name="cc_active_challenge_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="challengeparticipant",
+            index=models.Index(fields=["challenge", "-score"], name="cc_participant_score_idx"),
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("community_challenge", "0007_add_hot_path_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="challenge",
+            name="rewards_distributed_at",
+            field=models.DateTimeField(
+                blank=True,
+                null=True,
+                help_text="Set once rewards are handed out. Clear it to allow distributing again.",
+            ),
+        ),
+    ]
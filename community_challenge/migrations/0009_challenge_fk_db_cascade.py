@@ -0,0 +1,62 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def replace_fk_sql(table, on_delete):
+    # Django names foreign key constraints with a hash suffix, so look the current one up
+    return f"""
+        DO $$
+        DECLARE fk text;
+        BEGIN
+            FOR fk IN
+                SELECT conname FROM pg_constraint
+                WHERE conrelid = '{table}'::regclass
+                  AND confrelid = 'community_challenge_challenge'::regclass
+                  AND contype = 'f'
+            LOOP
+                EXECUTE format('ALTER TABLE {table} DROP CONSTRAINT %I', fk);
+            END LOOP;
+        END $$;
+        ALTER TABLE {table}
+            ADD CONSTRAINT {table}_challenge_id_fk
+            FOREIGN KEY (challenge_id) REFERENCES community_challenge_challenge (id)
+            {on_delete} DEFERRABLE INITIALLY DEFERRED;
+    """
+
+
+def cascade_fk(table):
+    return migrations.RunSQL(
+        sql=replace_fk_sql(table, "ON DELETE CASCADE"),
+        reverse_sql=replace_fk_sql(table, "ON DELETE NO ACTION"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("community_challenge", "0008_challenge_rewards_distributed_at"),
+    ]
+
+    operations = [
+        # on_delete is not a database attribute for Django, so these only change the state
+        migrations.AlterField(
+            model_name="challengeparticipant",
+            name="challenge",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name="participants",
+                to="community_challenge.challenge",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="challengereward",
+            name="challenge",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name="rewards",
+                to="community_challenge.challenge",
+            ),
+        ),
+        cascade_fk("community_challenge_challengeparticipant"),
+        cascade_fk("community_challenge_challengereward"),
+    ]
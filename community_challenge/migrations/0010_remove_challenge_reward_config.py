@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("community_challenge", "0009_challenge_fk_db_cascade"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="challenge",
+            name="reward_config",
+        ),
+        migrations.AlterField(
+            model_name="challenge",
+            name="goal_type",
+            field=models.CharField(choices=[("balls", "Balls Caught")], default="balls", max_length=16),
+        ),
+    ]
@@ -0,0 +1,53 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("community_challenge", "0010_remove_challenge_reward_config"),
+    ]
+
+    operations = [
+        # A plain AlterField would also drop and recreate the foreign key without the
+        # ON DELETE CASCADE added in 0009, so only the single-column index is dropped here
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name="challengeparticipant",
+                    name="challenge",
+                    field=models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="participants",
+                        to="community_challenge.challenge",
+                    ),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    sql="""
+                        DO $$
+                        DECLARE idx text;
+                        BEGIN
+                            FOR idx IN
+                                SELECT i.relname FROM pg_index x
+                                JOIN pg_class i ON i.oid = x.indexrelid
+                                JOIN pg_attribute a ON a.attrelid = x.indrelid AND a.attnum = x.indkey[0]
+                                WHERE x.indrelid = 'community_challenge_challengeparticipant'::regclass
+                                  AND x.indnatts = 1
+                                  AND NOT x.indisunique
+                                  AND a.attname = 'challenge_id'
+                            LOOP
+                                EXECUTE format('DROP INDEX %I', idx);
+                            END LOOP;
+                        END $$;
+                    """,
+                    reverse_sql="""
+                        CREATE INDEX community_challenge_challengeparticipant_challenge_id
+                        ON community_challenge_challengeparticipant (challenge_id);
+                    """,
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("community_challenge", "0011_challengeparticipant_challenge_no_index"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="challengereward",
+            options={"verbose_name": "Reward", "verbose_name_plural": "Rewards"},
+        ),
+    ]
@@ -13,13 +13,25 @@ class Challenge(models.Model):
     ]
     goal_type = models.CharField(max_length=16, choices=GOAL_CHOICES, default="balls")
     active = models.BooleanField(default=True)
+    rewards_distributed_at = models.DateTimeField(
+        null=True, blank=True, help_text="Set once rewards are handed out. Clear it to allow distributing again."
+    )
 
     def __str__(self):
         return self.name
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["end_time"], condition=models.Q(active=True), name="cc_active_challenge_idx")
+        ]
+
 
 class ChallengeReward(models.Model):
-    challenge = models.ForeignKey(Challenge, on_delete=models.CASCADE, related_name="rewards")
+    challenge = models.ForeignKey(
+        Challenge,
+        on_delete=models.DO_NOTHING,  # ON DELETE CASCADE in the database, see migration 0009
+        related_name="rewards",
+    )
     rank = models.PositiveIntegerField(help_text="The rank this reward is given to (e.g., 1 for 1st place).")
     ball = models.ForeignKey(Ball, on_delete=models.CASCADE, help_text="The specific ball to reward.")
     amount = models.PositiveIntegerField(default=1, help_text="How many of this ball to give.")
@@ -28,13 +40,17 @@ class ChallengeReward(models.Model):
         return f"Rank {self.rank} reward for {self.challenge}"
 
     class Meta:
-        ordering = ["rank"]
         verbose_name = "Reward"
         verbose_name_plural = "Rewards"
 
 
 class ChallengeParticipant(models.Model):
-    challenge = models.ForeignKey(Challenge, on_delete=models.CASCADE, related_name="participants")
+    challenge = models.ForeignKey(
+        Challenge,
+        on_delete=models.DO_NOTHING,  # ON DELETE CASCADE in the database, see migration 0009
+        related_name="participants",
+        db_index=False,  # leading column of unique_challenge_player and cc_participant_score_idx
+    )
     player = models.ForeignKey(Player, on_delete=models.CASCADE)
     score = models.IntegerField(default=0)
 
@@ -44,4 +60,7 @@ class ChallengeParticipant(models.Model):
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=["challenge", "player"], name="unique_challenge_player")
+        ]
+        indexes = [
+            models.Index(fields=["challenge", "-score"], name="cc_participant_score_idx")
         ]
\ No newline at end of file
@@ -1,7 +1,12 @@
 import logging
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ballsdex.core.bot import BallsDexBot
+
 log = logging.getLogger("ballsdex.packages.community_challenges")
 
-def apply_patches():
+def apply_patches(bot: "BallsDexBot"):
     log.info("Applying Community Challenges monkey patches...")
     try:
         from ballsdex.packages.countryballs.countryball import BallSpawnView
@@ -10,12 +15,10 @@ def apply_patches():
         async def patched_catch_ball(self, user, *, player, guild):
             result = await original_catch(self, user, player=player, guild=guild)
             try:
-                from ballsdex.core.bot import BallsDexBot
-                import discord
-                if hasattr(user, '_state') and user._state:
-                    bot = user._state._get_client()
-                    if bot:
-                        bot.dispatch("challenge_score_add", user.id, "balls", 1)
+                if player is not None:
+                    bot.dispatch("challenge_player_score_add", player.pk, "balls", 1)
+                else:
+                    bot.dispatch("challenge_score_add", user.id, "balls", 1)
             except Exception:
                 pass
             return result